@@ -3,6 +3,7 @@
 
 from machine import SPI, Pin
 import framebuf
+import micropython
 import time
 
 # ST7789V Commands
@@ -31,6 +32,7 @@ ST7789_WRDISBV    = 0x51
 ST7789_WRCACE     = 0x55
 ST7789_WRCABCMB   = 0x5E
 ST7789_RDABC      = 0x68
+ST7789_RAMCTRL    = 0xB0
 ST7789_RDID1      = 0xDA
 ST7789_RDID2      = 0xDB
 ST7789_RDID3      = 0xDC
@@ -46,27 +48,73 @@ COLOR_MAGENTA     = 0xF81F
 COLOR_YELLOW      = 0xFFE0
 COLOR_GRAY        = 0x8410
 
+# 初始化命令表，每项为: 命令, 数据长度 n, n 个数据字节, 延时(ms)
+_INIT_SEQ = (
+    b'\x11\x00\x78',      # SLPOUT, 120ms
+    b'\x3a\x01\x05\x00',  # COLMOD: 16-bit RGB565
+    b'\x21\x00\x0a',      # INVON（需要 INVON）, 10ms
+)
+
+# 纯色填充时重复发送的图案缓冲区大小（512字节 = 256像素）
+_PATTERN = 512
+
+def _swap16(c):
+    """RGB565 color as big-endian bytes (high byte first)"""
+    return bytes((c >> 8, c & 0xFF))
+
+@micropython.viper
+def _swap_inplace(buf: ptr8, n: int):
+    """Swap each byte pair of the first n bytes of buf in place (RGB565 LE <-> BE)"""
+    i = 0
+    while i < n:
+        a = buf[i]
+        buf[i] = buf[i + 1]
+        buf[i + 1] = a
+        i += 2
+
+@micropython.viper
+def _swap32_inplace(buf: ptr32, n_words: int):
+    """Swap bytes of two RGB565 pixels per 32-bit word, in place (buf must be word aligned)"""
+    i = 0
+    while i < n_words:
+        w = buf[i]
+        buf[i] = ((w >> 8) & 0x00FF00FF) | ((w & 0x00FF00FF) << 8)
+        i += 1
+
 class ST7789V(framebuf.FrameBuffer):
     """ST7789V LCD driver for DNESP32S3 (240x320)"""
 
-    def __init__(self, spi, dc, cs=None, width=240, height=320, rotation=0, xl9555=None):
+    def __init__(self, spi, dc, cs=None, width=240, height=320, rotation=0, xl9555=None,
+                 little_endian=True, baudrate=None):
         """
         Initialize ST7789V display.
         
         Args:
-            spi: machine.SPI object (e.g., SPI(1))
+            spi: Hardware machine.SPI object, e.g.
+                SPI(1, baudrate=40_000_000, polarity=1, phase=1, sck=..., mosi=..., miso=...).
+                SoftSPI works but is roughly 20x slower on ESP32-S3.
             dc: Data/Command pin (machine.Pin)
             cs: Chip Select pin (optional, can be controlled by SPI)
             width: Display width (default 240)
             height: Display height (default 320)
             rotation: Display rotation (0, 1, 2, 3)
             xl9555: Optional XL9555 instance for RST/BL control (see note below)
+            little_endian: Set RAMCTRL so the panel reads RGB565 in framebuf's
+                native byte order (default True). Pass False for panels that
+                ignore the ENDIAN bit; show() then byte-swaps in software.
+            baudrate: Optional SPI clock to apply via spi.init() (e.g. 40_000_000)
         """
         self.width = width
         self.height = height
         self.spi = spi
+        if 'Soft' in type(spi).__name__:
+            print("Warning: SoftSPI detected, use hardware SPI(1, baudrate=40_000_000, ...)")
+        if baudrate:
+            self.spi.init(baudrate=baudrate)
         self.dc = dc
         self.cs = cs
+        self._little_endian = little_endian
+        self._cmd1 = bytearray(1)  # 命令字节缓冲区，避免每次 bytes([cmd]) 分配
         if self.cs:
             self.cs.init(self.cs.OUT, value=1)
         self.dc.init(self.dc.OUT, value=0)
@@ -74,6 +122,13 @@ class ST7789V(framebuf.FrameBuffer):
         # Framebuffer setup
         self.buffer = bytearray(self.width * self.height * 2)
         super().__init__(self.buffer, self.width, self.height, framebuf.RGB565)
+        # fill_color() 复用的纯色图案，颜色不变时不重新生成
+        self._pattern = bytearray(_PATTERN)
+        self._pattern_mv = memoryview(self._pattern)
+        self._pattern_color = None
+        # set_window() 复用的 CASET/RASET 参数缓冲区
+        self._caset = bytearray(4)
+        self._raset = bytearray(4)
 
         # Hardware reset via XL9555 if provided
         if xl9555:
@@ -94,7 +149,8 @@ class ST7789V(framebuf.FrameBuffer):
         if self.cs:
             self.cs(0)
         self.dc(0)
-        self.spi.write(bytes([cmd]))
+        self._cmd1[0] = cmd
+        self.spi.write(self._cmd1)
         if self.cs:
             self.cs(1)
 
@@ -107,11 +163,25 @@ class ST7789V(framebuf.FrameBuffer):
         if self.cs:
             self.cs(1)
 
+    def _write_reg_buf(self, reg, data):
+        """Write command followed by a data buffer within one CS assertion"""
+        cs = self.cs
+        if cs:
+            cs(0)
+        self.dc(0)
+        self._cmd1[0] = reg
+        self.spi.write(self._cmd1)
+        self.dc(1)
+        self.spi.write(data)
+        if cs:
+            cs(1)
+
     def _write_reg(self, reg, *data):
         """Write command followed by data"""
-        self._write_cmd(reg)
         if data:
-            self._write_data(bytes(data))
+            self._write_reg_buf(reg, bytes(data))
+        else:
+            self._write_cmd(reg)
 
     def reset(self):
         """Hardware reset using XL9555 or external pin"""
@@ -131,6 +201,14 @@ class ST7789V(framebuf.FrameBuffer):
         else:
             print("Warning: Backlight control not available without XL9555")
 
+    def _run_init(self, seq):
+        """Send a (cmd, n, data..., delay_ms) command table"""
+        for entry in seq:
+            n = entry[1]
+            self._write_reg(entry[0], *entry[2:2 + n])
+            if entry[2 + n]:
+                time.sleep_ms(entry[2 + n])
+
     def init_display(self, rotation=0):
         # 硬件复位（通过 XL9555）
         if self._use_xl9555:
@@ -140,10 +218,10 @@ class ST7789V(framebuf.FrameBuffer):
             time.sleep_ms(120)
 
         # 硬件复位...
-        self._write_cmd(ST7789_SLPOUT); time.sleep_ms(120)
-        self._write_reg(ST7789_COLMOD, 0x05)  # 16-bit RGB565
-        self._write_cmd(ST7789_INVON)         # 需要 INVON
-        time.sleep_ms(10)
+        self._run_init(_INIT_SEQ)             # SLPOUT, COLMOD, INVON
+        if self._little_endian:
+            # RAMCTRL: ENDIAN=1，屏幕直接接收 framebuf 的小端 RGB565
+            self._write_reg(ST7789_RAMCTRL, 0x00, 0xF8)
         self.set_rotation(rotation)           # 此处 MADCTL=0x60（无BGR）
         self._write_cmd(ST7789_DISPON); time.sleep_ms(100)
         self.set_backlight(True)
@@ -176,51 +254,136 @@ class ST7789V(framebuf.FrameBuffer):
         y_start = y
         y_end = y + h - 1
 
-        self._write_reg(ST7789_CASET, (x_start >> 8) & 0xFF, x_start & 0xFF,
-                                      (x_end >> 8) & 0xFF, x_end & 0xFF)
-        self._write_reg(ST7789_RASET, (y_start >> 8) & 0xFF, y_start & 0xFF,
-                                      (y_end >> 8) & 0xFF, y_end & 0xFF)
+        write_reg_buf = self._write_reg_buf
+
+        c = self._caset
+        c[0] = (x_start >> 8) & 0xFF
+        c[1] = x_start & 0xFF
+        c[2] = (x_end >> 8) & 0xFF
+        c[3] = x_end & 0xFF
+        write_reg_buf(ST7789_CASET, c)
+
+        r = self._raset
+        r[0] = (y_start >> 8) & 0xFF
+        r[1] = y_start & 0xFF
+        r[2] = (y_end >> 8) & 0xFF
+        r[3] = y_end & 0xFF
+        write_reg_buf(ST7789_RASET, r)
+
         self._write_cmd(ST7789_RAMWR)
 
 
     def show(self):
         """
-        刷新屏幕（关键：小端序 → 大端序转换）
-        使用高效原地转换，零额外内存开销
+        刷新屏幕
+        小端模式下直接发送 framebuf；否则做小端序 → 大端序转换
         """
         buf = self.buffer
-        n = len(buf)
+        cs = self.cs
+        spi_write = self.spi.write
         
         # 1. 设置窗口
         self.set_window(0, 0, self.width, self.height)
         
-        # 2. 高效字节序转换 + 发送（单次遍历）
-        self.cs(0)
+        cs(0)
         self.dc(1)
         
-        # 分块发送提升SPI效率（每块512字节 = 256像素）
-        CHUNK = 512
-        for i in range(0, n, CHUNK):
-            end = min(i + CHUNK, n)
-            # 创建临时块（避免频繁SPI调用）
-            chunk = bytearray(end - i)
-            # 转换字节序：小端 → 大端
-            for j in range(0, end - i, 2):
-                chunk[j] = buf[i + j + 1]   # 高字节
-                chunk[j + 1] = buf[i + j]   # 低字节
-            self.spi.write(chunk)
+        if self._little_endian:
+            # 2. 屏幕按小端接收，无需转换
+            spi_write(buf)
+            cs(1)
+            return
         
+        # 2. 原地转换字节序 → 整帧一次发送 → 转换回来（后续绘图仍用小端）
+        # machine.SPI.write 是阻塞调用，无法让转换与 DMA 并行，
+        # 因此不做乒乓双缓冲，整帧一次传输即可
+        # 按 32 位字一次转换两个像素；像素数为奇数时单独处理最后一个
+        n = len(buf)
+        words = n >> 2
+        tail = memoryview(buf)[n - 2:] if n & 2 else None
+        _swap32_inplace(buf, words)
+        if tail:
+            _swap_inplace(tail, 2)
+        spi_write(buf)
+        _swap32_inplace(buf, words)
+        if tail:
+            _swap_inplace(tail, 2)
+        
+        cs(1)
+
+    def show_rect(self, x, y, w, h):
+        """Refresh only the given rectangle of the framebuffer to the screen"""
+        r = self._clip(x, y, w, h)
+        if not r:
+            return
+        x, y, w, h = r
+        buf = memoryview(self.buffer)
+        cs = self.cs
+        spi_write = self.spi.write
+        swap = not self._little_endian
+        stride = self.width * 2
+
+        if w == self.width:
+            # 整行宽度时各行在 framebuf 中连续，一次发送
+            off, n, rows = y * stride, h * stride, 1
+        else:
+            off, n, rows = y * stride + x * 2, w * 2, h
+
+        self.set_window(x, y, w, h)
+        cs(0)
+        self.dc(1)
+        for _ in range(rows):
+            seg = buf[off:off + n]
+            if swap:
+                _swap_inplace(seg, n)
+            spi_write(seg)
+            if swap:
+                _swap_inplace(seg, n)
+            off += stride
+        cs(1)
+
+    def _write_pattern(self, color, n):
+        """Stream n bytes of solid color to the current GRAM window"""
+        pat = self._pattern
+        mv = self._pattern_mv
+        if color != self._pattern_color:
+            # 按屏幕字节序写入首个像素，再倍增复制填满（log2 次 memcpy）
+            if self._little_endian:
+                mv[0:2] = bytes((color & 0xFF, color >> 8))
+            else:
+                mv[0:2] = _swap16(color)
+            k = 2
+            while k < _PATTERN:
+                mv[k:2 * k] = mv[0:k]
+                k *= 2
+            self._pattern_color = color
+
+        spi_write = self.spi.write
+        self.cs(0)
+        self.dc(1)
+        for _ in range(n // _PATTERN):
+            spi_write(pat)
+        rem = n % _PATTERN
+        if rem:
+            spi_write(mv[:rem])
         self.cs(1)
 
+    def fill_color(self, color):
+        """Clear the whole screen to color without going through show()"""
+        # 同步更新 framebuf，后续局部绘制和 show() 保持一致
+        super().fill(color)
+        self.set_window(0, 0, self.width, self.height)
+        self._write_pattern(color, self.width * self.height * 2)
+
     def pixel(self, x, y, color):
         """Draw single pixel (override for clipping)"""
         if 0 <= x < self.width and 0 <= y < self.height:
             super().pixel(x, y, color)
 
-    def fill_rect(self, x, y, w, h, color):
-        """Fast fill rectangle"""
+    def _clip(self, x, y, w, h):
+        """Clip rectangle to the screen, return (x, y, w, h) or None if empty"""
         if w <= 0 or h <= 0:
-            return
+            return None
         end_x = x + w
         end_y = y + h
         if x < 0:
@@ -231,4 +394,23 @@ class ST7789V(framebuf.FrameBuffer):
             end_x = self.width
         if end_y > self.height:
             end_y = self.height
-        super().fill_rect(x, y, end_x - x, end_y - y, color)
+        if end_x <= x or end_y <= y:
+            return None
+        return x, y, end_x - x, end_y - y
+
+    def fill_rect(self, x, y, w, h, color):
+        """Fast fill rectangle"""
+        r = self._clip(x, y, w, h)
+        if r:
+            super().fill_rect(r[0], r[1], r[2], r[3], color)
+
+    def fill_rect_direct(self, x, y, w, h, color):
+        """Fill rectangle on screen immediately, sending only its 2*w*h bytes"""
+        r = self._clip(x, y, w, h)
+        if not r:
+            return
+        x, y, w, h = r
+        # 同步更新 framebuf，后续 show() 保持一致
+        super().fill_rect(x, y, w, h, color)
+        self.set_window(x, y, w, h)
+        self._write_pattern(color, w * h * 2)
@@ -1,4 +1,5 @@
 from machine import I2C
+import micropython
 
 class XL9555:
     """XL9555 16位I2C GPIO扩展芯片驱动"""
@@ -49,6 +50,12 @@ class XL9555:
         self.address = address
         self._output_cache = [0x00, 0x00]  # 缓存输出状态
         self._config_cache = [0xFF, 0xFF]  # 缓存配置状态
+        # 预计算每个引脚的 (端口, 位掩码, 输出寄存器)，避免每次调用做 // 和 %
+        self._pin_table = [(p // 8, 1 << (p % 8), self.REG_OUTPUT_PORT0 + p // 8)
+                           for p in range(16)]
+        # 预分配读写缓冲区，寄存器访问不产生堆分配
+        self._buf1 = bytearray(1)  # 单个寄存器
+        self._buf2 = bytearray(2)  # P0/P1 两个寄存器 (地址自增)
         
         # 根据硬件设计配置IO方向:
         # P00、P01、P14-P17 为输入 (1)
@@ -60,13 +67,14 @@ class XL9555:
         self.set_output(0xFFFF)
     
     def _read_reg(self, reg):
-        """读取单个寄存器"""
-        self.i2c.writeto(self.address, bytes([reg]))
-        return self.i2c.readfrom(self.address, 1)[0]
+        """读取单个寄存器 (重复起始条件，单次I2C事务)"""
+        self.i2c.readfrom_mem_into(self.address, reg, self._buf1)
+        return self._buf1[0]
     
     def _write_reg(self, reg, value):
         """写入单个寄存器"""
-        self.i2c.writeto(self.address, bytes([reg, value]))
+        self._buf1[0] = value
+        self.i2c.writeto_mem(self.address, reg, self._buf1)
     
     def config(self, config0, config1):
         """
@@ -88,9 +96,20 @@ class XL9555:
         Returns:
             16位整数，低8位为P0，高8位为P1
         """
-        port0 = self._read_reg(self.REG_INPUT_PORT0)
-        port1 = self._read_reg(self.REG_INPUT_PORT1)
-        return (port1 << 8) | port0
+        return self.get_input_both()
+    
+    def get_input_both(self):
+        """
+        一次I2C读取两个输入端口 (寄存器地址自增 0x00 → 0x01)
+        
+        比分别读取两个端口少一半总线时间，且两个端口为同一时刻的状态
+        
+        Returns:
+            16位整数，低8位为P0，高8位为P1
+        """
+        data = self._buf2
+        self.i2c.readfrom_mem_into(self.address, self.REG_INPUT_PORT0, data)
+        return data[0] | (data[1] << 8)
     
     def get_input_port(self, port):
         """
@@ -143,6 +162,7 @@ class XL9555:
         """
         return (self._output_cache[1] << 8) | self._output_cache[0]
     
+    @micropython.native
     def write_pin(self, pin, value):
         """
         设置单个引脚输出电平
@@ -154,16 +174,48 @@ class XL9555:
         if not 0 <= pin <= 15:
             raise ValueError("Pin must be between 0 and 15")
         
-        port = pin // 8
-        bit = pin % 8
+        port, mask, reg = self._pin_table[pin]
+        c = self._output_cache[port]
+        c = (c | mask) if value else (c & ~mask)
+        self._output_cache[port] = c
+        self._write_reg(reg, c)
+    
+    def write_pins(self, pairs):
+        """
+        同时设置多个引脚输出电平，最多一次I2C写入
+        
+        两个端口都有变化时利用寄存器地址自增 (0x02 → 0x03) 一次写入
         
-        if value:
-            self._output_cache[port] |= (1 << bit)
-        else:
-            self._output_cache[port] &= ~(1 << bit)
+        Args:
+            pairs: (引脚号, 电平) 序列，例如 ((P12, 0), (P13, 1))
+        """
+        cache = [self._output_cache[0], self._output_cache[1]]
+        for pin, value in pairs:
+            if not 0 <= pin <= 15:
+                raise ValueError("Pin must be between 0 and 15")
+            port, mask, _ = self._pin_table[pin]
+            if value:
+                cache[port] |= mask
+            else:
+                cache[port] &= ~mask
+        port0, port1 = cache
+        
+        changed0 = port0 != self._output_cache[0]
+        changed1 = port1 != self._output_cache[1]
+        self._output_cache[0] = port0
+        self._output_cache[1] = port1
         
-        self._write_reg(self.REG_OUTPUT_PORT0 + port, self._output_cache[port])
+        if changed0 and changed1:
+            buf = self._buf2
+            buf[0] = port0
+            buf[1] = port1
+            self.i2c.writeto_mem(self.address, self.REG_OUTPUT_PORT0, buf)
+        elif changed0:
+            self._write_reg(self.REG_OUTPUT_PORT0, port0)
+        elif changed1:
+            self._write_reg(self.REG_OUTPUT_PORT1, port1)
     
+    @micropython.native
     def read_pin(self, pin):
         """
         读取单个引脚状态
@@ -177,19 +229,19 @@ class XL9555:
         if not 0 <= pin <= 15:
             raise ValueError("Pin must be between 0 and 15")
         
-        port = pin // 8
-        bit = pin % 8
+        port, mask, _ = self._pin_table[pin]
         
         # 检查该引脚是否配置为输入
-        if self._config_cache[port] & (1 << bit):
+        if self._config_cache[port] & mask:
             # 从输入寄存器读取
             value = self._read_reg(self.REG_INPUT_PORT0 + port)
         else:
             # 从输出缓存读取
             value = self._output_cache[port]
         
-        return (value >> bit) & 1
+        return 1 if value & mask else 0
     
+    @micropython.native
     def toggle_pin(self, pin):
         """
         翻转单个引脚输出电平
@@ -227,6 +279,7 @@ class XL9555:
         """
         self.write_pin(self.P04, enable)
     
+    @micropython.native
     def key_scan(self):
         """
         扫描按键状态 (KEY0-KEY3)
@@ -240,7 +293,7 @@ class XL9555:
                 -1 = 无按键按下
         """
         # 读取所有输入
-        inputs = self.get_input()
+        inputs = self.get_input_both()
         
         # 检查按键 (低电平有效)
         if not (inputs & (1 << self.P11)):  # KEY0